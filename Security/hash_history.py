@@ -1,18 +1,54 @@
 from __future__ import annotations
 
+import atexit
 import json
 import os
 import datetime
-from typing import Any
+import threading
+from typing import IO, Any
 
 
 _LOG_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "logs", "hash_history.log")
+_TAIL_CHUNK_SIZE = 8192
+_log_handle: IO[str] | None = None
+_log_lock = threading.Lock()
 
 
 def _ensure_log_dir() -> None:
     os.makedirs(os.path.dirname(_LOG_PATH), exist_ok=True)
 
 
+def _close_log_handle() -> None:
+    global _log_handle
+    with _log_lock:
+        if _log_handle is not None:
+            _log_handle.close()
+            _log_handle = None
+
+
+def _log_handle_is_stale() -> bool:
+    # Rename-and-create rotation leaves the path pointing at a different inode.
+    try:
+        return os.fstat(_log_handle.fileno()).st_ino != os.stat(_LOG_PATH).st_ino
+    except FileNotFoundError:
+        return True
+
+
+def _append_log_line(line: str) -> None:
+    global _log_handle
+    with _log_lock:
+        # Reopen if the log was rotated or removed underneath us.
+        if _log_handle is None or _log_handle_is_stale():
+            if _log_handle is not None:
+                _log_handle.close()
+            _ensure_log_dir()
+            _log_handle = open(_LOG_PATH, "a", encoding="utf-8", buffering=1)
+        _log_handle.write(line + "\n")
+
+
+atexit.register(_close_log_handle)
+
+
 def _write_payload_to_db(payload: dict[str, Any]) -> None:
     try:
         from app.database import SessionLocal
@@ -71,6 +107,51 @@ def _read_payloads_from_db(limit: int | None = 50) -> list[dict[str, Any]]:
         return []
 
 
+def _iter_lines_reversed(path: str):
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        pos = f.tell()
+        remainder = b""
+        while pos > 0:
+            step = min(_TAIL_CHUNK_SIZE, pos)
+            pos -= step
+            f.seek(pos)
+            parts = (f.read(step) + remainder).split(b"\n")
+            remainder = parts.pop(0)
+            for part in reversed(parts):
+                if part.strip():
+                    yield part.decode("utf-8").strip()
+        if remainder.strip():
+            yield remainder.decode("utf-8").strip()
+
+
+def _read_payloads_from_file(limit: int | None = 50) -> list[dict[str, Any]]:
+    if not os.path.exists(_LOG_PATH):
+        return []
+
+    entries: list[dict[str, Any]] = []
+    if limit is None:
+        with open(_LOG_PATH, "r", encoding="utf-8") as f:
+            lines = [line.strip() for line in f if line.strip()]
+        for line in lines:
+            try:
+                entries.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue
+        return entries
+
+    # The log is append-only, so the newest entries are at the tail.
+    for line in _iter_lines_reversed(_LOG_PATH):
+        if len(entries) >= limit:
+            break
+        try:
+            entries.append(json.loads(line))
+        except json.JSONDecodeError:
+            continue
+    entries.reverse()
+    return entries
+
+
 def log_hash_history(
     *,
     entity_type: str,
@@ -83,9 +164,8 @@ def log_hash_history(
     employee_name: str | None = None,
     details: str | None = None,
 ) -> None:
-    _ensure_log_dir()
     payload = {
-        "timestamp": datetime.datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S UTC"),
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).strftime("%Y-%m-%d %H:%M:%S UTC"),
         "entity_type": entity_type,
         "entity_id": entity_id,
         "field_name": field_name,
@@ -96,22 +176,13 @@ def log_hash_history(
         "employee_name": employee_name,
         "details": details,
     }
-    with open(_LOG_PATH, "a", encoding="utf-8") as f:
-        f.write(json.dumps(payload, ensure_ascii=False) + "\n")
+    _append_log_line(json.dumps(payload, ensure_ascii=False))
     _write_payload_to_db(payload)
 
 
 def read_hash_history(limit: int | None = 50) -> list[dict[str, Any]]:
-    db_entries = _read_payloads_from_db(limit=None)
-    file_entries: list[dict[str, Any]] = []
-    if os.path.exists(_LOG_PATH):
-        with open(_LOG_PATH, "r", encoding="utf-8") as f:
-            lines = [line.strip() for line in f if line.strip()]
-        for line in lines:
-            try:
-                file_entries.append(json.loads(line))
-            except json.JSONDecodeError:
-                continue
+    db_entries = _read_payloads_from_db(limit=limit)
+    file_entries = _read_payloads_from_file(limit=limit)
 
     if not db_entries and not file_entries:
         return []
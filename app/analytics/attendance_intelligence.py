@@ -2,6 +2,7 @@ from sqlalchemy.orm import Session
 from sqlalchemy import func
 from app.models import Attendance, AttendanceDaily, User, LeaveRequest
 import pandas as pd
+import numpy as np
 import datetime
 
 # =========================================================
@@ -28,27 +29,30 @@ def get_attendance_dataframe(db: Session, employee_id: str | None = None, days:
     if not rows:
         return pd.DataFrame(columns=["date", "entry_time", "duration", "employee_id", "name", "department", "login_hour"])
 
-    data = []
-    for r in rows:
-        data.append({
-            "date": r.date,
-            "entry_time": r.entry_time,
-            "duration": float(r.duration) if r.duration else 0.0,
-            "employee_id": r.employee_id,
-            "name": r.employee_name,
-            "department": r.department
-        })
-
-    df = pd.DataFrame(data)
+    df = pd.DataFrame.from_records(
+        rows,
+        columns=["date", "entry_time", "duration", "employee_id", "name", "department"]
+    )
+    df["duration"] = df["duration"].fillna(0.0).astype(float)
     
     if not df.empty and "entry_time" in df.columns:
-        df["login_hour"] = pd.to_datetime(df["entry_time"]).dt.hour + (pd.to_datetime(df["entry_time"]).dt.minute / 60)
+        # entry_time already holds datetime objects, so cast instead of re-parsing
+        entry = df["entry_time"].to_numpy().astype("datetime64[m]")
+        minute_of_day = (entry - entry.astype("datetime64[D]")).astype(np.int64)
+        login_hour = (minute_of_day // 60) + (minute_of_day % 60) / 60
+        df["login_hour"] = np.where(np.isnat(entry), np.nan, login_hour)
     
     return df
 
 # =========================================================
 # 2. METRICS ENGINE
 # =========================================================
+def _leave_span_days(db: Session):
+    # Inclusive day count of a leave request; DATEDIFF is MySQL/MariaDB only
+    if db.bind.dialect.name == "sqlite":
+        return func.julianday(LeaveRequest.end_date) - func.julianday(LeaveRequest.start_date) + 1
+    return func.datediff(LeaveRequest.end_date, LeaveRequest.start_date) + 1
+
 def compute_behavior_metrics(db: Session, df: pd.DataFrame, employee_id: str | None = None):
     metrics = {
         "average_login_hour": 0,
@@ -91,29 +95,29 @@ def compute_behavior_metrics(db: Session, df: pd.DataFrame, employee_id: str | N
 
     # --- C. DataFrame Analytics ---
     if not df.empty:
-        metrics["average_work_hours"] = round(df["duration"].mean(), 2)
-        metrics["average_login_hour"] = round(df["login_hour"].mean(), 2)
+        means = df[["duration", "login_hour"]].mean()
+        metrics["average_work_hours"] = round(means["duration"], 2)
+        metrics["average_login_hour"] = round(means["login_hour"], 2)
         metrics["total_days_analyzed"] = len(df)
 
     # --- D. Future Leaves ---
+    upcoming_days = func.sum(_leave_span_days(db))
     if employee_id:
         metrics["leaves_remaining"] = max(0, metrics["leaves_allowed"] - metrics["leave_days"])
-        upcoming_reqs = db.query(LeaveRequest).filter(
+        future_days = int(db.query(upcoming_days).filter(
             LeaveRequest.employee_id == employee_id,
             LeaveRequest.status == 'Approved',
             LeaveRequest.start_date > datetime.date.today()
-        ).all()
-        future_days = sum([(req.end_date - req.start_date).days + 1 for req in upcoming_reqs])
+        ).scalar() or 0)
         metrics["upcoming_leave_days"] = future_days
         if future_days > 0:
             metrics["alerts"].append(f"Scheduled for {future_days} days of leave soon")
     else:
         # Organization View
-        all_upcoming = db.query(LeaveRequest).filter(
+        total_future = int(db.query(upcoming_days).filter(
             LeaveRequest.status == 'Approved',
             LeaveRequest.start_date > datetime.date.today()
-        ).all()
-        total_future = sum([(req.end_date - req.start_date).days + 1 for req in all_upcoming])
+        ).scalar() or 0)
         metrics["upcoming_leave_days"] = total_future
         if total_future > 5:
             metrics["alerts"].append(f"{total_future} total man-days of leave upcoming")
@@ -146,6 +150,19 @@ def compute_behavior_metrics(db: Session, df: pd.DataFrame, employee_id: str | N
 # =========================================================
 # 3. ANOMALY DETECTION
 # =========================================================
+def _anomaly_records(rows: pd.DataFrame, val, reason, severity):
+    out = pd.DataFrame({
+        "date": rows["date"],
+        "name": rows.get("name", "Unknown"),
+        "id": rows.get("employee_id", ""),
+        "dept": rows.get("department", ""),
+        "val": val,
+        "reason": reason,
+        "severity": severity
+    }, index=rows.index)
+    return out.to_dict("records")
+
+
 def detect_attendance_anomalies(df: pd.DataFrame):
     anomalies = []
     if df.empty or len(df) < 5:
@@ -153,49 +170,38 @@ def detect_attendance_anomalies(df: pd.DataFrame):
 
     std_dev = df["duration"].std()
     mean_val = df["duration"].mean()
+    flagged = pd.DataFrame(columns=["date", "employee_id"])
 
     if std_dev > 0:
-        df["z_score"] = (df["duration"] - mean_val) / std_dev
-        outliers = df[abs(df["z_score"]) > 1.8]
-
-        for _, row in outliers.iterrows():
-            reason = (
-                "Shift too long (>12h)" if row["duration"] > 12 else
-                "Shift too short (<4h)" if row["duration"] < 4 else
-                "Unusual duration"
-            )
-
-            anomalies.append({
-                "date": row["date"],
-                "name": row.get("name", "Unknown"),
-                "id": row.get("employee_id", ""),
-                "dept": row.get("department", ""),
-                "val": f"{row['duration']:.1f}h",
-                "reason": reason,
-                "severity": "high" if abs(row["z_score"]) > 2.5 else "medium"
-            })
+        z_score = (df["duration"] - mean_val) / std_dev
+        mask = z_score.abs() > 1.8
+        outliers = df[mask]
+        duration = outliers["duration"]
+
+        reason = np.select(
+            [duration > 12, duration < 4],
+            ["Shift too long (>12h)", "Shift too short (<4h)"],
+            default="Unusual duration"
+        )
+        severity = np.where(z_score[mask].abs() > 2.5, "high", "medium")
+        anomalies.extend(_anomaly_records(outliers, duration.map("{:.1f}h".format), reason, severity))
+        flagged = outliers[["date", "employee_id"]]
 
     if "login_hour" in df.columns:
         org_mean_entry = df["login_hour"].mean()
         late_entries = df[df["login_hour"] > (org_mean_entry + 1.5)]
 
-        for _, row in late_entries.iterrows():
-            h = int(row["login_hour"])
-            m = int((row["login_hour"] % 1) * 60)
-
-            if not any(
-                a["date"] == row["date"] and a["id"] == row["employee_id"]
-                for a in anomalies
-            ):
-                anomalies.append({
-                    "date": row["date"],
-                    "name": row.get("name", "Unknown"),
-                    "id": row.get("employee_id", ""),
-                    "dept": row.get("department", ""),
-                    "val": f"{h:02d}:{m:02d}",
-                    "reason": "Late Arrival",
-                    "severity": "medium"
-                })
+        # Keep one late entry per employee-day, skipping days already flagged above
+        late_entries = late_entries.drop_duplicates(subset=["date", "employee_id"])
+        already = pd.MultiIndex.from_frame(flagged)
+        keys = pd.MultiIndex.from_frame(late_entries[["date", "employee_id"]])
+        late_entries = late_entries[~keys.isin(already)]
+
+        if not late_entries.empty:
+            login_hour = late_entries["login_hour"]
+            hours = login_hour.astype(int).map("{:02d}".format)
+            minutes = ((login_hour % 1) * 60).astype(int).map("{:02d}".format)
+            anomalies.extend(_anomaly_records(late_entries, hours + ":" + minutes, "Late Arrival", "medium"))
 
     return sorted(anomalies, key=lambda x: x["date"], reverse=True)[:20]
 
@@ -204,86 +210,97 @@ def detect_attendance_anomalies(df: pd.DataFrame):
 # 4. DEPARTMENT STATS
 # =========================================================
 def compute_department_stats(db: Session):
-    depts = db.query(User.department).filter(User.is_active==True).distinct().all()
+    headcounts = db.query(User.department, func.count(User.id))\
+        .filter(User.is_active==True)\
+        .group_by(User.department).all()
+
+    cutoff_date = datetime.date.today() - datetime.timedelta(days=30)
+    status_counts = db.query(
+        User.department,
+        AttendanceDaily.status,
+        func.count(AttendanceDaily.id)
+    ).join(User, AttendanceDaily.user_id == User.id)\
+     .filter(
+        User.is_active==True,
+        AttendanceDaily.status.in_(['ABSENT', 'LATE']),
+        AttendanceDaily.date >= cutoff_date
+    ).group_by(User.department, AttendanceDaily.status).all()
+    stat_map = {(d, s): c for d, s, c in status_counts}
+
     dept_stats = []
+    for d_name, headcount in headcounts:
+        if not d_name or not headcount: continue
 
-    for (d_name,) in depts:
-        if not d_name: continue
-        
-        users = db.query(User).filter(User.department == d_name, User.is_active==True).all()
-        ids = [u.employee_id for u in users]
-        if not ids: continue
-
-        absents = db.query(AttendanceDaily).filter(
-            AttendanceDaily.user_id.in_([u.id for u in users]),
-            AttendanceDaily.status == 'ABSENT',
-            AttendanceDaily.date >= datetime.date.today() - datetime.timedelta(days=30)
-        ).count()
-        
-        lates = db.query(AttendanceDaily).filter(
-            AttendanceDaily.user_id.in_([u.id for u in users]),
-            AttendanceDaily.status == 'LATE',
-            AttendanceDaily.date >= datetime.date.today() - datetime.timedelta(days=30)
-        ).count()
+        absents = stat_map.get((d_name, 'ABSENT'), 0)
+        lates = stat_map.get((d_name, 'LATE'), 0)
         
         base = 100
         penalty = (absents * 5) + (lates * 2)
-        avg_penalty = penalty / len(users)
+        avg_penalty = penalty / headcount
         dept_score = max(0, int(base - avg_penalty))
         
         dept_stats.append({
             "name": d_name,
-            "headcount": len(users),
+            "headcount": headcount,
             "score": dept_score,
             "status": "Excellent" if dept_score > 85 else "Risk" if dept_score < 65 else "Good"
         })
 
     return sorted(dept_stats, key=lambda x: x["score"])
 
-# =========================================================
-# 5. LEADERBOARD (FIXED)
-# =========================================================
 # =========================================================
 # 5. LEADERBOARD (FIXED)
 # =========================================================
 def compute_performer_lists(db: Session):
-    top, low = [], []
-    users = db.query(User).filter(
+    users = db.query(
+        User.id.label("user_id"),
+        User.employee_id,
+        User.name,
+        User.department.label("dept")
+    ).filter(
         User.is_active == True,
         User.role != 'admin'
     ).all()
 
-    df = get_attendance_dataframe(db, days=30)
-
-    for user in users:
-        if df.empty:
-            continue
-
-        u_df = df[df["employee_id"] == user.employee_id]
-
-        # 🚫 Never entered office
-        if u_df.empty:
-            continue
-
-        metrics = compute_behavior_metrics(db, u_df, user.employee_id)
-
-        # 🚫 No present days
-        if metrics.get("present_days", 0) == 0:
-            continue
-
-        rec = {
-            "name": user.name,
-            "employee_id": user.employee_id,
-            "score": metrics["attendance_score"],
-            "dept": user.department
-        }
-
-        if metrics["attendance_score"] >= 90:
-            top.append(rec)
-        elif metrics["attendance_score"] < 70:
-            low.append(rec)
+    cutoff_date = datetime.date.today() - datetime.timedelta(days=30)
+    entered_ids = [
+        row[0] for row in db.query(Attendance.employee_id)
+        .filter(Attendance.date >= cutoff_date)
+        .distinct().all()
+    ]
+    if not entered_ids or not users:
+        return [], []
+
+    # Single grouped query instead of one metrics pass per employee
+    daily_rows = db.query(
+        AttendanceDaily.user_id,
+        AttendanceDaily.status,
+        func.count(AttendanceDaily.id)
+    ).filter(AttendanceDaily.date >= cutoff_date)\
+     .group_by(AttendanceDaily.user_id, AttendanceDaily.status).all()
+    if not daily_rows:
+        return [], []
+
+    daily_df = pd.DataFrame(daily_rows, columns=["user_id", "status", "count"])
+    counts = daily_df.groupby(["user_id", "status"])["count"].sum().unstack(fill_value=0)
+    for status in ("PRESENT", "ABSENT", "LEAVE", "LATE"):
+        if status not in counts.columns:
+            counts[status] = 0
+
+    scores = pd.DataFrame(users, columns=["user_id", "employee_id", "name", "dept"])\
+        .merge(counts, left_on="user_id", right_index=True, how="inner")
+
+    # 🚫 Never entered office / 🚫 No present days
+    scores = scores[scores["employee_id"].isin(entered_ids) & (scores["PRESENT"] > 0)]
+    scores = scores.assign(score=(
+        100 - (scores["ABSENT"] * 5) - (scores["LATE"] * 2) - (scores["LEAVE"] * 1)
+    ).clip(0, 100))
+
+    cols = ["name", "employee_id", "score", "dept"]
+    top = scores[scores["score"] >= 90].sort_values("score", ascending=False, kind="stable")
+    low = scores[scores["score"] < 70].sort_values("score", kind="stable")
 
     return (
-        sorted(top, key=lambda x: x["score"], reverse=True)[:5],
-        sorted(low, key=lambda x: x["score"])[:5]
-    )
\ No newline at end of file
+        top[cols].head(5).to_dict("records"),
+        low[cols].head(5).to_dict("records")
+    )
@@ -3,6 +3,7 @@ from fastapi.templating import Jinja2Templates
 from sqlalchemy.orm import Session
 from .database import get_db
 from .models import Notification, User
+import functools
 import hashlib
 
 templates = Jinja2Templates(directory="templates")
@@ -26,6 +27,7 @@ def create_notification(
     ))
 
 
+@functools.lru_cache(maxsize=4096)
 def hash_employee_id(value: str) -> str:
     return hashlib.sha256(value.encode()).hexdigest()
 
@@ -2,21 +2,62 @@ import datetime
 
 from fastapi import APIRouter, Depends, Form, HTTPException, Request
 from fastapi.responses import HTMLResponse, RedirectResponse
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload, selectinload
 
 from .app_context import create_notification, get_current_user, get_db, hash_employee_id, templates
 from .models import Project, ProjectAssignment, ProjectTask, ProjectTaskAssignee, Team, TeamMember, User
 
 router = APIRouter(prefix="/leader")
 
+LEADER_ROLES = ("team_lead", "manager", "employee")
+
+
+def require_leader_role(user: User = Depends(get_current_user)) -> User:
+    # Declared ahead of get_my_team so forbidden roles are rejected before any team query.
+    if user.role not in LEADER_ROLES:
+        raise HTTPException(status_code=403)
+    return user
+
+
+def get_my_team(
+    user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+) -> Team | None:
+    # FastAPI caches dependencies per request, so every route shares this one lookup.
+    return (
+        db.query(Team)
+        .options(joinedload(Team.project))
+        .filter(Team.leader_id == user.id)
+        .first()
+    )
+
+
+def _team_projects(team: Team) -> list[Project]:
+    if team.project_id and team.project:
+        return [team.project]
+    return []
+
+
+def _available_members(db: Session, user: User) -> list[User]:
+    return (
+        db.query(User)
+        .filter(
+            User.is_active == True,
+            User.role != "admin",
+            User.id != user.id,
+        )
+        .order_by(User.name.asc())
+        .all()
+    )
+
 
 @router.post("/delete_task")
 async def delete_task(
     task_id: int = Form(...),
     user: User = Depends(get_current_user),
+    my_team: Team | None = Depends(get_my_team),
     db: Session = Depends(get_db),
 ):
-    my_team = db.query(Team).filter(Team.leader_id == user.id).first()
     task = db.query(ProjectTask).filter(ProjectTask.id == task_id).first()
     if not my_team or not task:
         raise HTTPException(status_code=403)
@@ -35,9 +76,9 @@ async def edit_task(
     deadline: str = Form(...),
     assign_to_employee_id: list = Form(...),
     user: User = Depends(get_current_user),
+    my_team: Team | None = Depends(get_my_team),
     db: Session = Depends(get_db),
 ):
-    my_team = db.query(Team).filter(Team.leader_id == user.id).first()
     task = db.query(ProjectTask).filter(ProjectTask.id == task_id).first()
     if not my_team or not task:
         raise HTTPException(status_code=403)
@@ -61,19 +102,22 @@ async def edit_task(
     }
     new_assignees = set(assign_to_employee_id)
 
-    for emp_id in current_assignees - new_assignees:
+    to_remove = current_assignees - new_assignees
+    to_add = new_assignees - current_assignees
+    if to_remove:
         db.query(ProjectTaskAssignee).filter(
             ProjectTaskAssignee.task_id == task_id,
-            ProjectTaskAssignee.employee_id == emp_id,
-        ).delete()
-    for emp_id in new_assignees - current_assignees:
-        db.add(
+            ProjectTaskAssignee.employee_id.in_(to_remove),
+        ).delete(synchronize_session=False)
+    if to_add:
+        db.bulk_save_objects([
             ProjectTaskAssignee(
                 task_id=task_id,
                 employee_id=emp_id,
                 employee_id_hash=hash_employee_id(emp_id),
             )
-        )
+            for emp_id in to_add
+        ])
     db.commit()
 
     return RedirectResponse(f"/leader/project/{task.project_id}", status_code=303)
@@ -82,37 +126,21 @@ async def edit_task(
 @router.get("/dashboard", response_class=HTMLResponse)
 async def leader_dashboard(
     request: Request,
-    user: User = Depends(get_current_user),
+    user: User = Depends(require_leader_role),
+    my_team: Team | None = Depends(get_my_team),
     db: Session = Depends(get_db),
 ):
-    my_team = db.query(Team).filter(Team.leader_id == user.id).first()
-    if not my_team or user.role not in ["team_lead", "manager", "employee"]:
+    if not my_team:
         raise HTTPException(status_code=403)
 
-    projects = []
-    if my_team.project_id:
-        assigned_project = db.query(Project).filter(Project.id == my_team.project_id).first()
-        if assigned_project:
-            projects = [assigned_project]
-    available_members = (
-        db.query(User)
-        .filter(
-            User.is_active == True,
-            User.role != "admin",
-            User.id != user.id,
-        )
-        .order_by(User.name.asc())
-        .all()
-    )
-
     return templates.TemplateResponse(
         "employee/employee_leader_dashboard.html",
         {
             "request": request,
             "user": user,
             "team": my_team,
-            "projects": projects,
-            "available_members": available_members,
+            "projects": _team_projects(my_team),
+            "available_members": _available_members(db, user),
         },
     )
 
@@ -120,11 +148,11 @@ async def leader_dashboard(
 @router.post("/add_member")
 async def add_member(
     employee_id: str = Form(...),
-    user: User = Depends(get_current_user),
+    user: User = Depends(require_leader_role),
+    my_team: Team | None = Depends(get_my_team),
     db: Session = Depends(get_db),
 ):
-    my_team = db.query(Team).filter(Team.leader_id == user.id).first()
-    if not my_team or user.role not in ["team_lead", "manager", "employee"]:
+    if not my_team:
         raise HTTPException(status_code=403)
 
     member = db.query(User).filter(User.employee_id == employee_id).first()
@@ -184,33 +212,15 @@ async def assign_task(
     title: str = Form(...),
     deadline: str = Form(...),
     assign_to_employee_id: list = Form(...),
-    user: User = Depends(get_current_user),
+    user: User = Depends(require_leader_role),
+    my_team: Team | None = Depends(get_my_team),
     db: Session = Depends(get_db),
 ):
-    if user.role not in ["team_lead", "manager", "employee"]:
-        raise HTTPException(status_code=403)
-    my_team = db.query(Team).filter(Team.leader_id == user.id).first()
     if not my_team:
         raise HTTPException(status_code=403)
     if not my_team.project_id or project_id != my_team.project_id:
         raise HTTPException(status_code=403, detail="You can only assign tasks for your team's assigned project.")
 
-    projects = []
-    if my_team.project_id:
-        assigned_project = db.query(Project).filter(Project.id == my_team.project_id).first()
-        if assigned_project:
-            projects = [assigned_project]
-    available_members = (
-        db.query(User)
-        .filter(
-            User.is_active == True,
-            User.role != "admin",
-            User.id != user.id,
-        )
-        .order_by(User.name.asc())
-        .all()
-    )
-
     existing_task = db.query(ProjectTask).filter(
         ProjectTask.project_id == project_id,
         ProjectTask.title == title,
@@ -223,8 +233,8 @@ async def assign_task(
                 "user": user,
                 "error": "Task with this title already exists in the project.",
                 "team": my_team,
-                "projects": projects,
-                "available_members": available_members,
+                "projects": _team_projects(my_team),
+                "available_members": _available_members(db, user),
             },
         )
 
@@ -237,20 +247,15 @@ async def assign_task(
     db.add(new_task)
     db.commit()
 
-    for emp_id in assign_to_employee_id:
-        already_assigned = db.query(ProjectTaskAssignee).filter(
-            ProjectTaskAssignee.task_id == new_task.id,
-            ProjectTaskAssignee.employee_id == emp_id,
-        ).first()
-        if already_assigned:
-            continue
-        db.add(
-            ProjectTaskAssignee(
-                task_id=new_task.id,
-                employee_id=emp_id,
-                employee_id_hash=hash_employee_id(emp_id),
-            )
+    # The task was just created, so only duplicates within the form need skipping.
+    db.bulk_save_objects([
+        ProjectTaskAssignee(
+            task_id=new_task.id,
+            employee_id=emp_id,
+            employee_id_hash=hash_employee_id(emp_id),
         )
+        for emp_id in dict.fromkeys(assign_to_employee_id)
+    ])
     db.commit()
 
     return RedirectResponse("/leader/dashboard", status_code=303)
@@ -261,21 +266,20 @@ async def leader_project_detail(
     request: Request,
     project_id: int,
     user: User = Depends(get_current_user),
+    my_team: Team | None = Depends(get_my_team),
     db: Session = Depends(get_db),
 ):
-    my_team = db.query(Team).filter(Team.leader_id == user.id).first()
     project = db.query(Project).filter(Project.id == project_id).first()
     if not my_team or not project or project.department != user.department:
         raise HTTPException(status_code=403)
 
-    tasks = db.query(ProjectTask).filter(ProjectTask.project_id == project.id).all()
-    for task in tasks:
-        task.assignees = db.query(ProjectTaskAssignee).filter(ProjectTaskAssignee.task_id == task.id).all()
-        for assignee in task.assignees:
-            assignee.employee = db.query(User).filter(User.employee_id == assignee.employee_id).first()
-            # Expose per-assignee status/completed_at for template
-            assignee.status = getattr(assignee, 'status', 'pending')
-            assignee.completed_at = getattr(assignee, 'completed_at', None)
+    # Load tasks, their assignees and assignee users in three queries total
+    tasks = (
+        db.query(ProjectTask)
+        .options(selectinload(ProjectTask.assignees).selectinload(ProjectTaskAssignee.employee))
+        .filter(ProjectTask.project_id == project.id)
+        .all()
+    )
     project.tasks = tasks
 
     return templates.TemplateResponse(
@@ -442,18 +442,14 @@ def mark_absent() -> None:
 
         present_ids = {p[0] for p in present_rows}
 
-        for user in all_users:
-            if user.id not in present_ids:
-                exists = db.query(AttendanceDaily).filter(
-                    AttendanceDaily.user_id == user.id,
-                    AttendanceDaily.date == today
-                ).first()
-                if not exists:
-                    db.add(AttendanceDaily(
-                        user_id=user.id,
-                        date=today,
-                        status="ABSENT"
-                    ))
+        # present_ids already covers every row for today, so no per-user re-check
+        absent_rows = [
+            AttendanceDaily(user_id=user.id, date=today, status="ABSENT")
+            for user in all_users
+            if user.id not in present_ids
+        ]
+        if absent_rows:
+            db.bulk_save_objects(absent_rows)
 
         db.commit()
     except Exception:
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, Float, Text, Date, ForeignKey, Time, Enum, UniqueConstraint, LargeBinary
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, Float, Text, Date, ForeignKey, Time, Enum, UniqueConstraint, LargeBinary, Index
 from sqlalchemy.orm import relationship
 from .database import Base
 import datetime
@@ -102,7 +102,7 @@ class Team(Base):
     project_id = Column(Integer, ForeignKey("projects.id"), nullable=True)
     
     # Who is acting as leader RIGHT NOW (swaps daily)
-    leader_id = Column(Integer, ForeignKey("users.id"), nullable=True)
+    leader_id = Column(Integer, ForeignKey("users.id"), nullable=True, index=True)
     
     # Who is the ACTUAL leader (to swap back to)
     permanent_leader_id = Column(Integer, ForeignKey("users.id"), nullable=True)
@@ -123,7 +123,7 @@ class Attendance(Base):
     # This is the simplified view used in the dashboard
     __tablename__ = "attendance"
     id = Column(Integer, primary_key=True, index=True)
-    employee_id = Column(String(60), ForeignKey("users.employee_id"), nullable=False, index=True)
+    employee_id = Column(String(60), ForeignKey("users.employee_id"), nullable=False)
     date = Column(Date, nullable=False)
     entry_time = Column(DateTime, nullable=True)
     exit_time = Column(DateTime, nullable=True)
@@ -132,6 +132,11 @@ class Attendance(Base):
     location_name = Column(String(100), nullable=True)
     room_no = Column(String(50), nullable=True)
 
+    __table_args__ = (
+        Index("ix_attendance_employee_date", "employee_id", "date"),
+        Index("ix_attendance_date", "date"),
+    )
+
     user = relationship("User", back_populates="attendance_logs")
 
 class AttendanceDaily(Base):
@@ -143,6 +148,11 @@ class AttendanceDaily(Base):
     status = Column(String(20)) # PRESENT, ABSENT, LEAVE, LATE
     check_in_time = Column(Time, nullable=True)
 
+    __table_args__ = (
+        Index("ix_attendance_daily_user_date", "user_id", "date"),
+        Index("ix_attendance_daily_date_status", "date", "status"),
+    )
+
 class AttendanceDate(Base):
     __tablename__ = "attendance_dates"
     id = Column(Integer, primary_key=True, index=True)
@@ -190,6 +200,10 @@ class LeaveRequest(Base):
     end_date = Column(Date)
     reason = Column(String(255))
     status = Column(String(20), default="Pending")
+
+    __table_args__ = (
+        Index("ix_leave_requests_employee_status_start", "employee_id", "status", "start_date"),
+    )
     
     # Relationship to access user department for Managers
     user = relationship("User", foreign_keys=[employee_id], primaryjoin="User.employee_id == LeaveRequest.employee_id")
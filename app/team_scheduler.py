@@ -15,6 +15,22 @@ def auto_assign_leaders():
     try:
         teams = db.query(Team).all()
 
+        # Today's leave and swipe status is the same for every team, so resolve it once
+        today = date.today()
+        day_start = datetime.combine(today, time(0, 0))
+        on_leave_ids = {
+            row[0] for row in db.query(LeaveRequest.employee_id).filter(
+                LeaveRequest.status == "Approved",
+                LeaveRequest.start_date <= today,
+                LeaveRequest.end_date >= today
+            ).all()
+        }
+        swiped_ids = {
+            row[0] for row in db.query(Attendance.employee_id).filter(
+                Attendance.entry_time >= day_start
+            ).distinct().all()
+        }
+
         for team in teams:
             perm_leader = team.permanent_leader
             
@@ -26,18 +42,10 @@ def auto_assign_leaders():
             is_perm_present = False
             
             # Check Leave
-            on_leave = db.query(LeaveRequest).filter(
-                LeaveRequest.employee_id == perm_leader.employee_id,
-                LeaveRequest.status == "Approved",
-                LeaveRequest.start_date <= date.today(),
-                LeaveRequest.end_date >= date.today()
-            ).first()
+            on_leave = perm_leader.employee_id in on_leave_ids
 
             # Check Attendance
-            has_swiped = db.query(Attendance).filter(
-                Attendance.employee_id == perm_leader.employee_id,
-                Attendance.entry_time >= datetime.combine(date.today(), time(0, 0))
-            ).first()
+            has_swiped = perm_leader.employee_id in swiped_ids
 
             if not on_leave and has_swiped:
                 is_perm_present = True
@@ -67,14 +75,7 @@ def auto_assign_leaders():
                     User.id != perm_leader.id # Don't pick the absent boss
                 ).all()
 
-                present_candidates = []
-                for cand in candidates:
-                    is_here = db.query(Attendance).filter(
-                        Attendance.employee_id == cand.employee_id,
-                        Attendance.entry_time >= datetime.combine(date.today(), time(0, 0))
-                    ).first()
-                    if is_here:
-                        present_candidates.append(cand)
+                present_candidates = [cand for cand in candidates if cand.employee_id in swiped_ids]
 
                 if present_candidates:
                     # Pick random or logic based (here: random for fairness/simplicity)